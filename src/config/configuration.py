@@ -11,6 +11,19 @@ from src.rag.retriever import Resource
 from src.config.report_style import ReportStyle
 
 
+_TRUE_STRINGS = {"1", "true", "yes", "on"}
+
+
+def _coerce_value(field_type: Any, value: Any) -> Any:
+    """Parse flags and numbers given as strings, e.g. LLM_CACHE_ENABLED=false."""
+    if isinstance(value, str):
+        if field_type is bool:
+            return value.strip().lower() in _TRUE_STRINGS
+        if field_type is int and value.strip():
+            return int(value)
+    return value
+
+
 @dataclass(kw_only=True)
 class Configuration:
     """The configurable fields."""
@@ -24,6 +37,13 @@ class Configuration:
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
     report_style: str = ReportStyle.ACADEMIC.value  # Report style
     enable_deep_thinking: bool = False  # Whether to enable deep thinking
+    parallel_subagent_concurrency: int = 4  # Maximum subagents running at once
+    # Whether to reuse plans for repeated topics; the cache key is the topic and
+    # locale only, so conversations with the same topic share one plan
+    plan_cache_enabled: bool = False
+    # Whether to reuse coordinator/reporter responses for temperature-0 models;
+    # cached answers are not streamed as message chunks to the client
+    llm_cache_enabled: bool = False
 
     @classmethod
     def from_runnable_config(
@@ -34,7 +54,9 @@ class Configuration:
             config["configurable"] if config and "configurable" in config else {}
         )
         values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
+            f.name: _coerce_value(
+                f.type, os.environ.get(f.name.upper(), configurable.get(f.name))
+            )
             for f in fields(cls)
             if f.init
         }
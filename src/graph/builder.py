@@ -21,6 +21,8 @@ Key improvements:
 - Unified schema and simplified routing logic
 """
 
+import functools
+
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from src.prompts.planner_model import StepType
@@ -37,14 +39,6 @@ from .nodes import (
 from .multi_agent_nodes import parallel_research_node
 
 
-def _check_plan_has_enough_context(state: State) -> str:
-    """Smart routing: skip research if plan has enough context"""
-    current_plan = state.get("current_plan")
-    if hasattr(current_plan, 'has_enough_context') and current_plan.has_enough_context:
-        return "reporter"
-    return "parallel_research"
-
-
 def _build_base_graph():
     """Build and return the unified multi-agent state graph."""
     builder = StateGraph(State)
@@ -65,23 +59,27 @@ def _build_base_graph():
     # Simple, direct edges
     builder.add_edge("background_investigator", "planner")
     
-    # Smart routing from planner
-    builder.add_conditional_edges(
-        "planner",
-        _check_plan_has_enough_context,
-        ["parallel_research", "reporter"]
-    )
+    # Smart routing from planner: planner_node returns Command(goto=...) with
+    # "parallel_research", or "reporter" when the plan has enough context.
+    # A conditional edge here would be evaluated on top of that Command and
+    # could start parallel_research even when the planner ended the run.
     
     # Always end at reporter
     builder.add_edge("parallel_research", "reporter")
     builder.add_edge("reporter", END)
     
-    # Human feedback redirects to parallel research
-    builder.add_edge("human_feedback", "parallel_research")
+    # human_feedback_node routes itself via Command(goto=...): parallel research,
+    # or straight to the reporter when the plan already has enough context
     
     return builder
 
 
+@functools.cache
+def _shared_builder():
+    """Build the state graph once per process; it can be compiled many times."""
+    return _build_base_graph()
+
+
 def build_graph_with_memory():
     """Build and return the agent workflow graph with memory."""
     # use persistent memory to save conversation history
@@ -89,14 +87,14 @@ def build_graph_with_memory():
     memory = MemorySaver()
 
     # build state graph
-    builder = _build_base_graph()
+    builder = _shared_builder()
     return builder.compile(checkpointer=memory)
 
 
 def build_graph():
     """Build and return the agent workflow graph without memory."""
     # build state graph
-    builder = _build_base_graph()
+    builder = _shared_builder()
     return builder.compile()
 
 
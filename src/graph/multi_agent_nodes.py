@@ -3,22 +3,143 @@
 
 import asyncio
 import logging
+import re
+from contextlib import aclosing
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.errors import GraphRecursionError
 from langgraph.types import Command
 
 from src.agents import create_agent
 from src.config.configuration import Configuration
+from src.prompts.multi_agent_planner_model import SubAgentStream, UnifiedResearchPlan
 from src.prompts.planner_model import Plan, Step
 from src.tools import get_web_search_tool, crawl_tool, python_repl_tool
 from .types import State
 
 logger = logging.getLogger(__name__)
 
+# Индикаторы для оценки сложности запроса (поиск подстрок без учета регистра)
+_COMPLEXITY_INDICATORS = (
+    "analyze", "compare", "comprehensive", "detailed", "market", "industry",
+    "анализ", "сравни", "всесторонний", "детальный", "рынок", "отрасль",
+    "research", "investigate", "study", "evaluation", "assessment",
+    "исследование", "изучение", "оценка", "влияние", "тенденции",
+)
 
-@dataclass
+_BREADTH_INDICATORS = (
+    "impact", "trends", "future", "current state", "stakeholders",
+    "влияние", "тенденции", "будущее", "текущее состояние", "участники",
+    "ecosystem", "landscape", "overview", "multiple", "various",
+    "экосистема", "ландшафт", "обзор", "множественный", "различные",
+)
+
+_TECHNICAL_INDICATORS = (
+    "technical", "architecture", "implementation", "code", "system",
+    "технический", "архитектура", "реализация", "код", "система",
+)
+
+
+def _compile_indicators(indicators) -> re.Pattern:
+    """Собирает список подстрок в одно регулярное выражение"""
+    return re.compile("|".join(map(re.escape, indicators)), re.IGNORECASE)
+
+
+_COMPLEXITY_RE = _compile_indicators(_COMPLEXITY_INDICATORS)
+_BREADTH_RE = _compile_indicators(_BREADTH_INDICATORS)
+_TECHNICAL_RE = _compile_indicators(_TECHNICAL_INDICATORS)
+_PARALLEL_RESEARCH_RE = _compile_indicators(
+    ("analyze", "compare", "comprehensive", "detailed", "market", "industry")
+)
+
+# Начиная с этой длины (~500 токенов) оценка сложности выполняется в потоке;
+# короткие запросы дешевле оценить сразу, чем передавать в поток
+_OFFLOAD_QUERY_CHARS = 2000
+
+# URL состоит только из ASCII-символов, допустимых в URL: текст на других
+# языках, кавычки, обратные кавычки и скобки разметки в него не попадают;
+# круглые скобки допустимы, лишние закрывающие отрезаются в _strip_url_tail
+_URL_RE = re.compile(r"https?://[A-Za-z0-9\-._~:/?#@!$&*+,;=%()]+")
+_URL_TRAILING_PUNCTUATION = ".,;:!?"
+
+# Полный набор возможных аспектов: (type, focus, шаблон description)
+_ASPECT_TEMPLATES = (
+    (
+        "current_state",
+        "Current State Analysis",
+        "Research the current state, recent developments and latest information about: {query}",
+    ),
+    (
+        "historical_context",
+        "Historical Context",
+        "Investigate the historical background, evolution and timeline related to: {query}",
+    ),
+    (
+        "stakeholder_analysis",
+        "Stakeholder Analysis",
+        "Analyze key players, stakeholders, companies and organizations involved in: {query}",
+    ),
+    (
+        "technical_specs",
+        "Technical Specifications & Architectures",
+        "Dive deep into technical specifications, architectures or underlying technologies related to: {query}",
+    ),
+    (
+        "data_analysis",
+        "Quantitative & Data Analysis",
+        "Perform quantitative analysis, statistics and data-driven insights for: {query}",
+    ),
+    (
+        "future_trends",
+        "Future Trends & Implications",
+        "Research future outlook, trends, predictions and implications for: {query}",
+    ),
+)
+
+# Какие аспекты брать для заданного числа субагентов; для остальных
+# значений берутся первые num_agents аспектов
+_ASPECT_SLICES = {
+    2: (0, 5),  # Простые запросы: current_state + future_trends
+    3: (0, 1, 5),  # Средние запросы: + historical_context
+}
+
+# Строки с ключевыми находками для сжатия результатов субагентов
+_KEY_LINE_RE = _compile_indicators(
+    ("key", "important", "finding", "result", "conclusion")
+)
+_MAX_KEY_LINES = 5
+
+# Лимит шагов субагента (вызов LLM и вызов инструментов - отдельные шаги)
+_SUBAGENT_RECURSION_LIMIT = 8
+
+# Аспекты, которым нужен Python REPL для анализа данных
+_REPL_ASPECTS = frozenset(
+    {"current_state", "future_trends", "data_analysis", "technical_specs"}
+)
+
+# Имена, под которыми планировщик может запросить Python REPL в tool_requirements
+_REPL_TOOL_NAMES = frozenset({python_repl_tool.name, "python_repl"})
+
+
+def _requires_repl(tool_requirements: List[str]) -> bool:
+    """Проверяет, запрошен ли Python REPL по имени инструмента или короткому псевдониму"""
+    return any(name in _REPL_TOOL_NAMES for name in tool_requirements)
+
+
+def _take_key_lines(content: str) -> List[str]:
+    """Возвращает первые _MAX_KEY_LINES строк с ключевыми находками"""
+    key_lines = []
+    for line in content.split('\n'):
+        if _KEY_LINE_RE.search(line):
+            key_lines.append(line)
+            if len(key_lines) == _MAX_KEY_LINES:
+                break
+    return key_lines
+
+
+@dataclass(slots=True, frozen=True)
 class SubAgentTask:
     """Задача для субагента с определенным фокусом исследования"""
     agent_id: str
@@ -29,15 +150,15 @@ class SubAgentTask:
     context_limit: int = 50000  # Отдельный контекст для каждого субагента
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SubAgentResult:
     """Результат работы субагента с сжатой информацией"""
     agent_id: str
     research_focus: str
     key_findings: str  # Сжатые ключевые находки
-    raw_data: str  # Исходные данные
     confidence_score: float  # Уверенность в результатах
     sources: List[str]  # Источники информации
+    success: bool  # Завершился ли субагент без ошибки
 
 
 class MultiAgentCoordinator:
@@ -45,7 +166,17 @@ class MultiAgentCoordinator:
     
     def __init__(self, config: Configuration):
         self.config = config
-        self.active_subagents: Dict[str, Any] = {}
+        # Инструменты создаются один раз на координатор: веб-поиск не нужно
+        # пересоздавать для каждой задачи субагента
+        self._web_tool = get_web_search_tool(config.max_search_results)
+        self._base_tools = [self._web_tool, crawl_tool]
+        self._tools_with_repl = self._base_tools + [python_repl_tool]
+        # Ограничиваем число одновременно работающих субагентов, чтобы не
+        # упираться в лимиты запросов LLM/поисковых провайдеров
+        self._semaphore = asyncio.Semaphore(max(1, config.parallel_subagent_concurrency or 4))
+        # Агенты переиспользуются между субагентами с одинаковым типом и
+        # набором инструментов: задача передается в HumanMessage, а не в промпт
+        self._agents: Dict[tuple, Any] = {}
         
     async def create_parallel_research_plan(self, query: str, max_subagents: int = 4) -> List[SubAgentTask]:
         """
@@ -53,13 +184,23 @@ class MultiAgentCoordinator:
         Аналог системы Anthropic для разложения задач
         """
         # NEW: Анализируем сложность запроса и адаптируем количество субагентов
-        complexity_score = self._assess_query_complexity(query)
+        if len(query) > _OFFLOAD_QUERY_CHARS:
+            # Длинные запросы сканируем в потоке, чтобы не блокировать event loop
+            complexity_score = await asyncio.to_thread(
+                self._assess_query_complexity, query
+            )
+        else:
+            complexity_score = self._assess_query_complexity(query)
         optimal_subagents = min(max_subagents, max(2, complexity_score))
         
-        logger.info(f"🧠 Query complexity score: {complexity_score}/5, using {optimal_subagents} subagents")
+        logger.info(
+            "🧠 Query complexity score: %s/5, using %s subagents",
+            complexity_score,
+            optimal_subagents,
+        )
         
         # Анализируем запрос и определяем аспекты для параллельного исследования
-        research_aspects = await self._identify_research_aspects(query, optimal_subagents)
+        research_aspects = self._identify_research_aspects(query, optimal_subagents)
         
         tasks = []
         for i, aspect in enumerate(research_aspects[:optimal_subagents]):
@@ -73,32 +214,49 @@ class MultiAgentCoordinator:
             )
             tasks.append(task)
             
-        logger.info(f"Created {len(tasks)} parallel subagent tasks")
+        logger.info("Created %s parallel subagent tasks", len(tasks))
         return tasks
     
+    def create_tasks_from_streams(
+        self, streams: List[SubAgentStream]
+    ) -> List[SubAgentTask]:
+        """Создает задачи субагентов из потоков, заданных планировщиком"""
+        tasks = []
+        for stream in streams:
+            needs_repl = _requires_repl(stream.tool_requirements)
+            tasks.append(
+                SubAgentTask(
+                    agent_id=stream.stream_id,
+                    research_focus=stream.research_focus,
+                    description=f"{stream.description}\n\nSuccess criteria: {stream.success_criteria}",
+                    tools=self._tools_with_repl if needs_repl else self._base_tools,
+                    agent_type="coder" if needs_repl else "researcher",
+                    context_limit=stream.context_limit,
+                )
+            )
+        return tasks
+
     async def execute_parallel_research(self, tasks: List[SubAgentTask], state: State) -> List[SubAgentResult]:
         """
         Выполняет параллельное исследование субагентами
         Ключевое отличие от текущей последовательной системы DeerFlow
         """
-        logger.info(f"Starting parallel execution of {len(tasks)} subagents")
+        logger.info("Starting parallel execution of %s subagents", len(tasks))
         
-        # Создаем корутины для параллельного выполнения
-        coroutines = [
-            self._execute_subagent_task(task, state) 
-            for task in tasks
-        ]
+        # Выполняем все субагенты параллельно; ошибки обрабатываются внутри
+        # _execute_subagent_task, поэтому группа не отменяет соседние задачи
+        async with asyncio.TaskGroup() as tg:
+            running = [
+                tg.create_task(self._execute_subagent_task(task, state))
+                for task in tasks
+            ]
         
-        # Выполняем все субагенты параллельно
-        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        successful_results = [t.result() for t in running]
         
-        # Фильтруем успешные результаты
-        successful_results = [
-            result for result in results 
-            if isinstance(result, SubAgentResult)
-        ]
-        
-        logger.info(f"Completed parallel research with {len(successful_results)} successful results")
+        logger.info(
+            "Completed parallel research with %s successful results",
+            len(successful_results),
+        )
         return successful_results
     
     async def _execute_subagent_task(self, task: SubAgentTask, state: State) -> SubAgentResult:
@@ -106,7 +264,7 @@ class MultiAgentCoordinator:
         Выполняет отдельную задачу субагента в изолированном контексте
         Каждый субагент работает независимо как у Anthropic
         """
-        logger.info(f"Executing subagent {task.agent_id} for {task.research_focus}")
+        logger.info("Executing subagent %s for %s", task.agent_id, task.research_focus)
         
         # Создаем изолированный контекст для субагента
         subagent_input = {
@@ -131,82 +289,104 @@ class MultiAgentCoordinator:
             ]
         }
         
-        # Создаем специализированного агента
-        agent = create_agent(
-            agent_name=task.agent_id,
-            agent_type=task.agent_type,
-            tools=task.tools,
-            prompt_template=task.agent_type
-        )
-        
         try:
-            # Выполняем исследование в ограниченном контексте
-            result = await agent.ainvoke(
-                input=subagent_input,
-                config={"recursion_limit": 15}  # Ограничиваем глубину для фокуса
-            )
-            
-            response_content = result["messages"][-1].content
+            async with self._semaphore:
+                # Получаем специализированного агента
+                agent = self._get_agent(task.agent_type, task.tools)
+                
+                # Выполняем исследование в ограниченном контексте
+                response_content = await self._run_agent(agent, subagent_input, task.agent_id)
             
-            # Извлекаем ключевые находки (компрессия как у Anthropic)
-            key_findings = await self._compress_findings(response_content, task.research_focus)
+            # Извлекаем ключевые находки (компрессия как у Anthropic); полный
+            # ответ в результат не сохраняем, репортеру нужны только находки
+            # Ключевые строки ищем один раз: они нужны и для сжатия, и для оценки уверенности
+            key_lines = _take_key_lines(response_content)
+            key_findings = self._compress_findings(
+                response_content, task.research_focus, key_lines
+            )
+            sources = self._extract_sources(response_content)
             
             return SubAgentResult(
                 agent_id=task.agent_id,
                 research_focus=task.research_focus,
                 key_findings=key_findings,
-                raw_data=response_content,
-                confidence_score=0.85,  # TODO: вычислять динамически
-                sources=self._extract_sources(response_content)
+                confidence_score=self._estimate_confidence(sources, bool(key_lines)),
+                sources=sources,
+                success=True
             )
             
         except Exception as e:
-            logger.error(f"Subagent {task.agent_id} failed: {str(e)}")
+            logger.error("Subagent %s failed: %s", task.agent_id, e)
             # Возвращаем частичный результат даже при ошибке
             return SubAgentResult(
                 agent_id=task.agent_id,
                 research_focus=task.research_focus,
                 key_findings=f"Research failed: {str(e)}",
-                raw_data="",
                 confidence_score=0.0,
-                sources=[]
+                sources=[],
+                success=False
+            )
+    
+    async def _run_agent(self, agent, subagent_input: Dict[str, Any], agent_id: str) -> str:
+        """
+        Запускает агента потоково и возвращает его последний ответ
+        Останавливается раньше, если ответ агента уже содержит достаточно
+        ключевых находок; при исчерпании лимита шагов возвращает то, что успели собрать
+        """
+        last_content = ""
+        last_ai_content = ""
+        try:
+            async with aclosing(agent.astream(
+                input=subagent_input,
+                config={"recursion_limit": _SUBAGENT_RECURSION_LIMIT},  # Ограничиваем глубину для фокуса
+                stream_mode="values",
+            )) as steps:
+                async for step in steps:
+                    message = step["messages"][-1]
+                    if isinstance(message, HumanMessage):
+                        continue  # Первый шаг - это сама постановка задачи
+                    last_content = message.content
+                    if isinstance(message, AIMessage) and message.content:
+                        last_ai_content = message.content
+                        if len(_take_key_lines(message.content)) == _MAX_KEY_LINES:
+                            # Находок достаточно - не ждем оставшихся вызовов инструментов
+                            break
+        except GraphRecursionError:
+            logger.warning(
+                "Subagent %s hit the recursion limit, using partial results", agent_id
             )
+        return last_ai_content or last_content
+    
+    def _get_agent(self, agent_type: str, tools: List[Any]):
+        """Возвращает агента для типа и набора инструментов, создавая его один раз"""
+        key = (agent_type, tuple(tool.name for tool in tools))
+        agent = self._agents.get(key)
+        if agent is None:
+            agent = create_agent(
+                agent_name=agent_type,
+                agent_type=agent_type,
+                tools=tools,
+                prompt_template=agent_type
+            )
+            self._agents[key] = agent
+        return agent
     
     def _assess_query_complexity(self, query: str) -> int:
         """
         Оценивает сложность запроса и возвращает оптимальное количество субагентов (2-5)
         """
-        complexity_indicators = [
-            "analyze", "compare", "comprehensive", "detailed", "market", "industry",
-            "анализ", "сравни", "всесторонний", "детальный", "рынок", "отрасль",
-            "research", "investigate", "study", "evaluation", "assessment",
-            "исследование", "изучение", "оценка", "влияние", "тенденции"
-        ]
-        
-        breadth_indicators = [
-            "impact", "trends", "future", "current state", "stakeholders",
-            "влияние", "тенденции", "будущее", "текущее состояние", "участники",
-            "ecosystem", "landscape", "overview", "multiple", "various",
-            "экосистема", "ландшафт", "обзор", "множественный", "различные"
-        ]
-        
-        technical_indicators = [
-            "technical", "architecture", "implementation", "code", "system",
-            "технический", "архитектура", "реализация", "код", "система"
-        ]
-        
         score = 2  # Базовый счет для любого запроса
         
         # +1 за сложность
-        if any(indicator in query.lower() for indicator in complexity_indicators):
+        if _COMPLEXITY_RE.search(query):
             score += 1
             
         # +1 за широту охвата
-        if any(indicator in query.lower() for indicator in breadth_indicators):
+        if _BREADTH_RE.search(query):
             score += 1
             
         # +1 за технические аспекты
-        if any(indicator in query.lower() for indicator in technical_indicators):
+        if _TECHNICAL_RE.search(query):
             score += 1
             
         # +1 за длинные запросы (обычно более сложные)
@@ -215,69 +395,25 @@ class MultiAgentCoordinator:
             
         return min(5, score)  # Максимум 5 субагентов
 
-    async def _identify_research_aspects(self, query: str, num_agents: int) -> List[Dict[str, str]]:
+    def _identify_research_aspects(self, query: str, num_agents: int) -> List[Dict[str, str]]:
         """
         Анализирует запрос и определяет аспекты для параллельного исследования
         Адаптируется под количество субагентов
         """
-        # Полный набор возможных аспектов
-        all_aspects = [
-            {
-                "type": "current_state",
-                "focus": "Current State Analysis", 
-                "description": f"Research the current state, recent developments and latest information about: {query}"
-            },
-            {
-                "type": "historical_context",
-                "focus": "Historical Context",
-                "description": f"Investigate the historical background, evolution and timeline related to: {query}"
-            },
-            {
-                "type": "stakeholder_analysis", 
-                "focus": "Stakeholder Analysis",
-                "description": f"Analyze key players, stakeholders, companies and organizations involved in: {query}"
-            },
-            {
-                "type": "technical_specs",
-                "focus": "Technical Specifications & Architectures",
-                "description": f"Dive deep into technical specifications, architectures or underlying technologies related to: {query}"
-            },
-            {
-                "type": "data_analysis",
-                "focus": "Quantitative & Data Analysis",
-                "description": f"Perform quantitative analysis, statistics and data-driven insights for: {query}"
-            },
-            {
-                "type": "future_trends",
-                "focus": "Future Trends & Implications", 
-                "description": f"Research future outlook, trends, predictions and implications for: {query}"
-            }
+        indices = _ASPECT_SLICES.get(
+            num_agents, range(min(num_agents, len(_ASPECT_TEMPLATES)))
+        )
+        return [
+            {"type": aspect_type, "focus": focus, "description": description.format(query=query)}
+            for aspect_type, focus, description in (_ASPECT_TEMPLATES[i] for i in indices)
         ]
-        
-        # Для простых запросов (2 субагента) - основы
-        if num_agents == 2:
-            return [all_aspects[0], all_aspects[5]]  # current_state + future_trends
-            
-        # Для средних запросов (3 субагента) - добавляем контекст
-        elif num_agents == 3:
-            return [all_aspects[0], all_aspects[1], all_aspects[5]]  # + historical_context
-            
-        # Для сложных запросов (4+ субагентов) - полный набор
-        else:
-            return all_aspects[:num_agents]
     
     def _select_tools_for_aspect(self, aspect_type: str) -> List[Any]:
         """Выбирает подходящие инструменты для типа исследования"""
-        base_tools = [
-            get_web_search_tool(self.config.max_search_results),
-            crawl_tool
-        ]
-        
-        if aspect_type in ["current_state", "future_trends", "data_analysis", "technical_specs"]:
+        if aspect_type in _REPL_ASPECTS:
             # Для анализа данных добавляем Python REPL
-            base_tools.append(python_repl_tool)
-            
-        return base_tools
+            return self._tools_with_repl
+        return self._base_tools
     
     def _get_agent_type_for_aspect(self, aspect_type: str) -> str:
         """Возвращает тип агента для данного аспекта"""
@@ -285,7 +421,12 @@ class MultiAgentCoordinator:
             return "coder"
         return "researcher"
     
-    async def _compress_findings(self, raw_content: str, focus_area: str) -> str:
+    def _compress_findings(
+        self,
+        raw_content: str,
+        focus_area: str,
+        key_lines: Optional[List[str]] = None,
+    ) -> str:
         """
         Сжимает результаты исследования в ключевые инсайты
         Критически важная функция компрессии как у Anthropic
@@ -293,22 +434,39 @@ class MultiAgentCoordinator:
         # TODO: Использовать LLM для интеллектуального сжатия
         # Пока простая версия - первые N символов + ключевые моменты
         
-        lines = raw_content.split('\n')
-        key_lines = [line for line in lines if any(keyword in line.lower() 
-                    for keyword in ['key', 'important', 'finding', 'result', 'conclusion'])]
+        if key_lines is None:
+            key_lines = _take_key_lines(raw_content)
         
         if key_lines:
-            compressed = '\n'.join(key_lines[:5])  # Топ-5 ключевых строк
+            compressed = '\n'.join(key_lines)  # Топ-5 ключевых строк
         else:
             compressed = raw_content[:1000] + "..." if len(raw_content) > 1000 else raw_content
             
         return f"**{focus_area}**:\n{compressed}"
     
+    def _estimate_confidence(self, sources: List[str], has_key_lines: bool) -> float:
+        """
+        Оценивает уверенность по числу источников и наличию ключевых находок
+        """
+        score = 0.5 + 0.1 * min(5, len(sources)) + (0.2 if has_key_lines else 0.0)
+        return min(1.0, score)
+    
     def _extract_sources(self, content: str) -> List[str]:
         """Извлекает источники из контента"""
-        import re
-        urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', content)
-        return list(set(urls))
+        # dict.fromkeys убирает дубликаты, сохраняя порядок появления
+        return list(dict.fromkeys(
+            _strip_url_tail(match.group(0)) for match in _URL_RE.finditer(content)
+        ))
+
+
+def _strip_url_tail(url: str) -> str:
+    """Отрезает конечную пунктуацию и непарные закрывающие скобки"""
+    while True:
+        url = url.rstrip(_URL_TRAILING_PUNCTUATION)
+        if url.endswith(")") and url.count(")") > url.count("("):
+            url = url[:-1]
+        else:
+            return url
 
 
 async def parallel_research_node(state: State, config: RunnableConfig) -> Command:
@@ -319,31 +477,43 @@ async def parallel_research_node(state: State, config: RunnableConfig) -> Comman
     logger.info("🚀🚀🚀 PARALLEL RESEARCH NODE АКТИВИРОВАН! 🚀🚀🚀")
     logger.info("Starting parallel multi-agent research")
     
-    configurable = Configuration.from_runnable_config(config)
-    coordinator = MultiAgentCoordinator(configurable)
-    
     # Получаем план исследования
     current_plan = state.get("current_plan")
     if not current_plan or not hasattr(current_plan, 'title'):
         logger.warning("No valid research plan found")
         return Command(goto="reporter")
     
+    # Координатор создает инструменты поиска, поэтому строим его только при наличии плана
+    configurable = Configuration.from_runnable_config(config)
+    coordinator = MultiAgentCoordinator(configurable)
+    
     query = str(current_plan.title)
-    logger.info(f"🎯 Исследуем: {query}")
+    logger.info("🎯 Исследуем: %s", query)
     
-    # Создаем план параллельного исследования  
-    logger.info("🏗️ Создаем параллельные задачи для субагентов...")
-    parallel_tasks = await coordinator.create_parallel_research_plan(
-        query, max_subagents=4
+    # Потоки из плана планировщика имеют приоритет над эвристическим разбиением
+    streams = (
+        current_plan.get_active_streams()
+        if isinstance(current_plan, UnifiedResearchPlan)
+        else []
     )
-    logger.info(f"✅ Создано {len(parallel_tasks)} параллельных задач")
+    if streams:
+        parallel_tasks = coordinator.create_tasks_from_streams(streams)
+    else:
+        logger.info("🏗️ Создаем параллельные задачи для субагентов...")
+        parallel_tasks = await coordinator.create_parallel_research_plan(
+            query, max_subagents=4
+        )
+    logger.info("✅ Создано %s параллельных задач", len(parallel_tasks))
     
     # Выполняем параллельное исследование
     logger.info("⚡ Запускаем параллельное выполнение субагентов...")
     subagent_results = await coordinator.execute_parallel_research(
         parallel_tasks, state
     )
-    logger.info(f"🎉 Параллельное исследование завершено! Получено {len(subagent_results)} результатов")
+    logger.info(
+        "🎉 Параллельное исследование завершено! Получено %s результатов",
+        len(subagent_results),
+    )
     
     # Собираем результаты для передачи репортеру
     observations = []
@@ -358,11 +528,24 @@ async def parallel_research_node(state: State, config: RunnableConfig) -> Comman
         """
         observations.append(observation)
     
-    logger.info(f"📊 Передаем репортеру {len(observations)} наблюдений для финального отчета")
+    if streams:
+        for result in subagent_results:
+            # Потоки неудачных субагентов остаются активными
+            if result.success:
+                current_plan.mark_stream_completed(
+                    result.agent_id, result.key_findings, result.confidence_score
+                )
+    
+    logger.info(
+        "📊 Передаем репортеру %s наблюдений для финального отчета",
+        len(observations),
+    )
     
     return Command(
         update={
             "observations": observations,
+            "current_plan": current_plan,
+            "subagent_results": [asdict(result) for result in subagent_results],
             "messages": [
                 AIMessage(
                     content=f"Parallel research completed with {len(subagent_results)} specialized investigations",
@@ -390,7 +573,5 @@ def should_use_parallel_research(state: State) -> bool:
         return True
         
     # Или если запрос содержит ключевые слова
-    query = state.get("research_topic", "").lower()
-    complexity_indicators = ["analyze", "compare", "comprehensive", "detailed", "market", "industry"]
-    
-    return any(indicator in query for indicator in complexity_indicators) 
\ No newline at end of file
+    query = state.get("research_topic", "")
+    return _PARALLEL_RESEARCH_RE.search(query) is not None
@@ -1,42 +1,41 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import functools
 import json
 import logging
-import os
-import re
 from typing import Annotated, Literal
 
-import mcp
+import json_repair
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.types import Command, interrupt
-from langchain_mcp_adapters.client import MultiServerMCPClient
 
-from src.agents import create_agent
 from src.tools.search import LoggedTavilySearch
-from src.tools import (
-    crawl_tool,
-    get_web_search_tool,
-    get_retriever_tool,
-    python_repl_tool,
-)
+from src.tools import get_web_search_tool
 
 from src.config.agents import AGENT_LLM_MAP
 from src.config.configuration import Configuration
 from src.llms.llm import get_llm_by_type
-from src.prompts.planner_model import Plan
-from src.prompts.multi_agent_planner_model import UnifiedResearchPlan, PlanningMode
+from src.llms.llm_cache import cached_invoke
+from src.prompts.multi_agent_planner_model import UnifiedResearchPlan
 from src.prompts.template import apply_prompt_template
-from src.utils.json_utils import repair_json_output
 
+from . import plan_cache
 from .types import State
 from ..config import SELECTED_SEARCH_ENGINE, SearchEngine
 
 logger = logging.getLogger(__name__)
 
+# Reminder about the report format, citation style, and table usage; kept
+# byte-identical across calls so it stays in the provider's prompt cache
+_REPORTER_REMINDER = HumanMessage(
+    content="IMPORTANT: Structure your report according to the format in the prompt. Remember to include:\n\n1. Key Points - A bulleted list of the most important findings\n2. Overview - A brief introduction to the topic\n3. Detailed Analysis - Organized into logical sections\n4. Survey Note (optional) - For more comprehensive reports\n5. Key Citations - List all references at the end\n\nFor citations, DO NOT include inline citations in the text. Instead, place all citations in the 'Key Citations' section at the end using the format: `- [Source Title](URL)`. Include an empty line between each citation for better readability.\n\nPRIORITIZE USING MARKDOWN TABLES for data presentation and comparison. Use tables whenever presenting comparative data, statistics, features, or options. Structure tables with clear headers and aligned columns. Example table format:\n\n| Feature | Description | Pros | Cons |\n|---------|-------------|------|------|\n| Feature 1 | Description 1 | Pros 1 | Cons 1 |\n| Feature 2 | Description 2 | Pros 2 | Cons 2 |",
+    name="system",
+)
+
 
 @tool
 def handoff_to_planner(
@@ -49,22 +48,20 @@ def handoff_to_planner(
     return
 
 
-def background_investigation_node(state: State, config: RunnableConfig):
+async def background_investigation_node(state: State, config: RunnableConfig):
     logger.info("background investigation node is running.")
     configurable = Configuration.from_runnable_config(config)
     query = state.get("research_topic")
     background_investigation_results = None
     if SELECTED_SEARCH_ENGINE == SearchEngine.TAVILY.value:
-        searched_content = LoggedTavilySearch(
+        searched_content = await LoggedTavilySearch(
             max_results=configurable.max_search_results
-        ).invoke(query)
+        ).ainvoke(query)
         if isinstance(searched_content, list):
-            background_investigation_results = [
-                f"## {elem['title']}\n\n{elem['content']}" for elem in searched_content
-            ]
             return {
                 "background_investigation_results": "\n\n".join(
-                    background_investigation_results
+                    f"## {elem['title']}\n\n{elem['content']}"
+                    for elem in searched_content
                 )
             }
         else:
@@ -72,9 +69,12 @@ def background_investigation_node(state: State, config: RunnableConfig):
                 f"Tavily search returned malformed response: {searched_content}"
             )
     else:
-        background_investigation_results = get_web_search_tool(
+        background_investigation_results = await get_web_search_tool(
             configurable.max_search_results
-        ).invoke(query)
+        ).ainvoke(query)
+        # Most search tools already return text; only structured results need to be serialized
+        if isinstance(background_investigation_results, str):
+            return {"background_investigation_results": background_investigation_results}
     return {
         "background_investigation_results": json.dumps(
             background_investigation_results, ensure_ascii=False
@@ -82,13 +82,40 @@ def background_investigation_node(state: State, config: RunnableConfig):
     }
 
 
+@functools.lru_cache(maxsize=4)
+def _get_planner_llm(deep_thinking: bool, planner_type: str):
+    """Build the planner LLM once per mode instead of re-binding the schema per call."""
+    if deep_thinking:
+        return get_llm_by_type("reasoning")
+    if planner_type == "basic":
+        # Always use UnifiedResearchPlan schema
+        return get_llm_by_type("basic").with_structured_output(
+            UnifiedResearchPlan,
+            method="json_mode",
+        )
+    return get_llm_by_type(planner_type)
+
+
 def planner_node(
     state: State, config: RunnableConfig
 ) -> Command[Literal["human_feedback", "reporter", "parallel_research"]]:
     """Planner node that generate the full plan."""
     logger.info("Planner generating research plan")
     configurable = Configuration.from_runnable_config(config)
-    plan_iterations = state["plan_iterations"] if state.get("plan_iterations", 0) else 0
+    plan_iterations = state.get("plan_iterations") or 0
+
+    # Only the first plan is cached: later iterations carry user feedback
+    use_plan_cache = configurable.plan_cache_enabled and plan_iterations == 0
+    research_topic = state.get("research_topic", "")
+    locale = state.get("locale", "en-US")
+    if use_plan_cache:
+        cached_plan = plan_cache.lookup(research_topic, locale)
+        if cached_plan is not None:
+            logger.info("Plan cache hit, skipping planner LLM call")
+            return _route_plan(
+                cached_plan, UnifiedResearchPlan.model_validate_json(cached_plan)
+            )
+        logger.info("Plan cache miss")
     
     # NEW: Always use multi-agent planning - it's more flexible
     template_name = "multi_agent_planner"
@@ -110,51 +137,29 @@ def planner_node(
                 }
             ]
 
-    if configurable.enable_deep_thinking:
-        llm = get_llm_by_type("reasoning")
-    elif AGENT_LLM_MAP["planner"] == "basic":
-        # Always use UnifiedResearchPlan schema
-        llm = get_llm_by_type("basic").with_structured_output(
-            UnifiedResearchPlan,
-            method="json_mode",
-        )
-    else:
-        llm = get_llm_by_type(AGENT_LLM_MAP["planner"])
-
     # if the plan iterations is greater than the max plan iterations, return the reporter node
     if plan_iterations >= configurable.max_plan_iterations:
         return Command(goto="reporter")
 
+    llm = _get_planner_llm(configurable.enable_deep_thinking, AGENT_LLM_MAP["planner"])
     full_response = ""
     if AGENT_LLM_MAP["planner"] == "basic" and not configurable.enable_deep_thinking:
         response = llm.invoke(messages)
-        # Extract JSON from content field
         if hasattr(response, 'content'):
-            content = response.content
-            json_match = re.search(r'```json\s*\n(.*?)\n```', content, re.DOTALL)
-            if json_match:
-                full_response = json_match.group(1)
-                logger.info("🔧 JSON extracted from markdown block")
-            else:
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    full_response = json_match.group(0)
-                    logger.info("🔧 JSON found directly in content")
-                else:
-                    full_response = content
+            full_response = response.content
         else:
             full_response = response.model_dump_json(indent=4, exclude_none=True)
     else:
-        response = llm.stream(messages)
-        for chunk in response:
-            full_response += chunk.content
+        full_response = "".join(chunk.content for chunk in llm.stream(messages))
     
     logger.debug(f"Current state messages: {state['messages']}")
     logger.info(f"Planner response: {full_response[:500]}...")
 
-    try:
-        curr_plan = json.loads(repair_json_output(full_response))
-    except json.JSONDecodeError:
+    # json_repair finds the object inside fences or prose and parses it in one pass
+    curr_plan = json_repair.repair_json(
+        full_response, skip_json_loads=True, return_objects=True
+    )
+    if not isinstance(curr_plan, dict):
         logger.warning("Planner response is not a valid JSON")
         if plan_iterations > 0:
             return Command(goto="reporter")
@@ -164,7 +169,13 @@ def planner_node(
     # NEW: Simple logic - create plan and go to parallel research
     logger.info("🚀 Research plan generated - going to parallel research")
     new_plan = UnifiedResearchPlan.model_validate(curr_plan)
-    
+    if use_plan_cache:
+        plan_cache.store(research_topic, locale, new_plan.model_dump_json())
+    return _route_plan(full_response, new_plan)
+
+
+def _route_plan(full_response: str, new_plan: UnifiedResearchPlan) -> Command:
+    """Route a validated plan either to the reporter or to parallel research."""
     # Check if we have enough context to skip research
     if new_plan.has_enough_context:
         logger.info("📚 Plan has enough context - going directly to reporter")
@@ -197,8 +208,10 @@ def human_feedback_node(
     if not auto_accepted_plan:
         feedback = interrupt("Please Review the Plan.")
 
+        # Only the prefix matters, so avoid upper-casing long edit feedback
+        head = str(feedback)[: len("[EDIT_PLAN]")].upper() if feedback else ""
         # if the feedback is not accepted, return the planner node
-        if feedback and str(feedback).upper().startswith("[EDIT_PLAN]"):
+        if head.startswith("[EDIT_PLAN]"):
             return Command(
                 update={
                     "messages": [
@@ -207,40 +220,43 @@ def human_feedback_node(
                 },
                 goto="planner",
             )
-        elif feedback and str(feedback).upper().startswith("[ACCEPTED]"):
+        elif head.startswith("[ACCEPTED]"):
             logger.info("Plan is accepted by user.")
         else:
             raise TypeError(f"Interrupt value of {feedback} is not supported.")
 
     # NEW: Simple logic - if plan accepted, go to parallel research
-    plan_iterations = state["plan_iterations"] if state.get("plan_iterations", 0) else 0
-    try:
-        current_plan = repair_json_output(current_plan)
-        plan_iterations += 1
-        new_plan = json.loads(current_plan)
-        
-        validated_plan = UnifiedResearchPlan.model_validate(new_plan)
-        if validated_plan.has_enough_context:
-            goto = "reporter"
-        else:
-            goto = "parallel_research"
-            
-        return Command(
-            update={
-                "current_plan": validated_plan,
-                "plan_iterations": plan_iterations,
-                "locale": new_plan["locale"],
-                "research_mode": "parallel",
-            },
-            goto=goto,
+    plan_iterations = state.get("plan_iterations") or 0
+    plan_iterations += 1
+    if isinstance(current_plan, UnifiedResearchPlan):
+        # planner_node already stores a validated plan, no need to parse it again
+        validated_plan = current_plan
+    else:
+        new_plan = json_repair.repair_json(
+            str(current_plan), skip_json_loads=True, return_objects=True
         )
-            
-    except json.JSONDecodeError:
-        logger.warning("Planner response is not a valid JSON")
-        if plan_iterations > 1:
-            return Command(goto="reporter")
-        else:
-            return Command(goto="__end__")
+        if not isinstance(new_plan, dict):
+            logger.warning("Planner response is not a valid JSON")
+            if plan_iterations > 1:
+                return Command(goto="reporter")
+            else:
+                return Command(goto="__end__")
+        validated_plan = UnifiedResearchPlan.model_validate(new_plan)
+
+    if validated_plan.has_enough_context:
+        goto = "reporter"
+    else:
+        goto = "parallel_research"
+
+    return Command(
+        update={
+            "current_plan": validated_plan,
+            "plan_iterations": plan_iterations,
+            "locale": validated_plan.locale,
+            "research_mode": "parallel",
+        },
+        goto=goto,
+    )
 
 
 def coordinator_node(
@@ -250,43 +266,50 @@ def coordinator_node(
     logger.info("Coordinator talking.")
     configurable = Configuration.from_runnable_config(config)
     messages = apply_prompt_template("coordinator", state)
-    response = (
-        get_llm_by_type(AGENT_LLM_MAP["coordinator"])
-        .bind_tools([handoff_to_planner])
-        .invoke(messages)
+    llm = get_llm_by_type(AGENT_LLM_MAP["coordinator"]).bind_tools(
+        [handoff_to_planner]
     )
+    if configurable.llm_cache_enabled:
+        response = cached_invoke(llm, messages, tools=[handoff_to_planner.name])
+    else:
+        response = llm.invoke(messages)
     logger.debug(f"Current state messages: {state['messages']}")
 
-    goto = "__end__"
     locale = state.get("locale", "en-US")  # Default locale if not specified
     research_topic = state.get("research_topic", "")
 
-    if len(response.tool_calls) > 0:
-        goto = "planner"
-        if state.get("enable_background_investigation"):
-            # if the search_before_planning is True, add the web search tool to the planner agent
-            goto = "background_investigator"
-        try:
-            for tool_call in response.tool_calls:
-                if tool_call.get("name", "") != "handoff_to_planner":
-                    continue
-                if tool_call.get("args", {}).get("locale") and tool_call.get(
-                    "args", {}
-                ).get("research_topic"):
-                    locale = tool_call.get("args", {}).get("locale")
-                    research_topic = tool_call.get("args", {}).get("research_topic")
-                    break
-        except Exception as e:
-            logger.error(f"Error processing tool calls: {e}")
-    else:
-        logger.warning(
-            "🚨 КООРДИНАТОР НЕ ВЫЗВАЛ handoff_to_planner!"
+    if not response.tool_calls:
+        # The response is an AIMessage here, so content is always present
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("🚨 КООРДИНАТОР НЕ ВЫЗВАЛ handoff_to_planner!")
+            logger.warning("📝 Полный ответ координатора: %s", response.content)
+            logger.warning("🔧 Тип ответа: %s", type(response).__name__)
+            logger.warning("❌ Завершаем выполнение рабочего процесса")
+        return Command(
+            update={
+                "locale": locale,
+                "research_topic": research_topic,
+                "resources": configurable.resources,
+            },
+            goto="__end__",
         )
-        logger.warning(f"📝 Полный ответ координатора: {response.content if hasattr(response, 'content') else str(response)}")
-        logger.warning(f"🔧 Тип ответа: {type(response)}")
-        if hasattr(response, 'tool_calls'):
-            logger.warning(f"🛠️ Tool calls: {response.tool_calls}")
-        logger.warning("❌ Завершаем выполнение рабочего процесса")
+
+    goto = "planner"
+    if state.get("enable_background_investigation"):
+        # if the search_before_planning is True, add the web search tool to the planner agent
+        goto = "background_investigator"
+    try:
+        for tool_call in response.tool_calls:
+            if tool_call.get("name") != "handoff_to_planner":
+                continue
+            args = tool_call.get("args") or {}
+            call_locale = args.get("locale")
+            call_topic = args.get("research_topic")
+            if call_locale and call_topic:
+                locale, research_topic = call_locale, call_topic
+                break
+    except Exception as e:
+        logger.error(f"Error processing tool calls: {e}")
 
     return Command(
         update={
@@ -304,7 +327,10 @@ def reporter_node(state: State, config: RunnableConfig):
     configurable = Configuration.from_runnable_config(config)
     current_plan = state.get("current_plan")
     input_ = {
+        # The constant reminder directly follows the system prompt, ahead of the
+        # per-task requirements and observations, so the shared prefix is contiguous
         "messages": [
+            _REPORTER_REMINDER,
             HumanMessage(
                 f"# Research Requirements\n\n## Task\n\n{current_plan.title}\n\n## Description\n\n{current_plan.thought}"
             )
@@ -314,15 +340,8 @@ def reporter_node(state: State, config: RunnableConfig):
     invoke_messages = apply_prompt_template("reporter", input_, configurable)
     observations = state.get("observations", [])
 
-    # Add a reminder about the new report format, citation style, and table usage
-    invoke_messages.append(
-        HumanMessage(
-            content="IMPORTANT: Structure your report according to the format in the prompt. Remember to include:\n\n1. Key Points - A bulleted list of the most important findings\n2. Overview - A brief introduction to the topic\n3. Detailed Analysis - Organized into logical sections\n4. Survey Note (optional) - For more comprehensive reports\n5. Key Citations - List all references at the end\n\nFor citations, DO NOT include inline citations in the text. Instead, place all citations in the 'Key Citations' section at the end using the format: `- [Source Title](URL)`. Include an empty line between each citation for better readability.\n\nPRIORITIZE USING MARKDOWN TABLES for data presentation and comparison. Use tables whenever presenting comparative data, statistics, features, or options. Structure tables with clear headers and aligned columns. Example table format:\n\n| Feature | Description | Pros | Cons |\n|---------|-------------|------|------|\n| Feature 1 | Description 1 | Pros 1 | Cons 1 |\n| Feature 2 | Description 2 | Pros 2 | Cons 2 |",
-            name="system",
-        )
-    )
-
-    for observation in observations:
+    # Parallel subagents can report identical findings; send each one only once
+    for observation in dict.fromkeys(observations):
         invoke_messages.append(
             HumanMessage(
                 content=f"Below are some observations for the research task:\n\n{observation}",
@@ -330,7 +349,11 @@ def reporter_node(state: State, config: RunnableConfig):
             )
         )
     logger.debug(f"Current invoke messages: {invoke_messages}")
-    response = get_llm_by_type(AGENT_LLM_MAP["reporter"]).invoke(invoke_messages)
+    llm = get_llm_by_type(AGENT_LLM_MAP["reporter"])
+    if configurable.llm_cache_enabled:
+        response = cached_invoke(llm, invoke_messages)
+    else:
+        response = llm.invoke(invoke_messages)
     response_content = response.content
     logger.info(f"reporter response: {response_content}")
 
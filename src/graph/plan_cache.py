@@ -0,0 +1,57 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+In-process cache of planner output.
+
+Plans are stored as JSON strings keyed by the normalized research topic and
+locale, so every hit is validated into a fresh UnifiedResearchPlan and runs
+never share mutable plan objects.
+
+The key deliberately ignores the conversation history, background
+investigation results and resources. With plan_cache_enabled, a run may
+therefore receive a plan that another conversation produced for the same
+topic and locale. The cache is process-wide and shared by all users.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+_MAX_ENTRIES = 128
+
+_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _make_key(topic: str, locale: str) -> tuple[str, str]:
+    """Normalize case and whitespace so trivially different topics share a plan."""
+    return " ".join(topic.lower().split()), locale
+
+
+def lookup(topic: str, locale: str) -> Optional[str]:
+    """Return the cached plan JSON for the topic, or None on a miss."""
+    key = _make_key(topic, locale)
+    with _lock:
+        plan_json = _cache.get(key)
+        if plan_json is not None:
+            _cache.move_to_end(key)
+    return plan_json
+
+
+def store(topic: str, locale: str, plan_json: str) -> None:
+    """Cache the plan JSON for the topic, evicting the least recently used entry."""
+    if not topic:
+        return
+    key = _make_key(topic, locale)
+    with _lock:
+        _cache[key] = plan_json
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def clear() -> None:
+    """Drop all cached plans."""
+    with _lock:
+        _cache.clear()
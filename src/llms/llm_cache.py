@@ -0,0 +1,113 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+In-process cache of LLM responses.
+
+Responses are keyed by a hash of the model name, the temperature, the prompt
+messages and the bound tool names. The CURRENT_TIME header rendered into every
+system prompt is left out of the key, otherwise no two calls would ever share
+an entry. Only deterministic calls (temperature == 0) are cached; any other
+call goes straight to the model.
+
+A cache hit returns the stored message without running the model, so no
+callbacks fire and no AIMessageChunk events are streamed. Clients that render
+the graph's "messages" stream (such as the web UI behind src/server/app.py)
+will not show a cached coordinator or reporter answer as it is produced; it
+only appears in the node's state update.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, convert_to_messages
+from langchain_core.runnables import Runnable
+
+logger = logging.getLogger(__name__)
+
+_MAX_ENTRIES = 256
+_CURRENT_TIME_RE = re.compile(r"^CURRENT_TIME: .*\n?", re.MULTILINE)
+
+_cache: "OrderedDict[str, BaseMessage]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _model_settings(llm: Runnable) -> tuple[Optional[str], Optional[float]]:
+    """Return the model name and temperature of a chat model or its binding."""
+    # bind_tools() wraps the chat model in a RunnableBinding
+    chat_model = getattr(llm, "bound", llm)
+    model = getattr(chat_model, "model_name", None) or getattr(
+        chat_model, "model", None
+    )
+    return model, getattr(chat_model, "temperature", None)
+
+
+def make_key(
+    model: str,
+    temperature: float,
+    messages: Sequence[Any],
+    tools: Sequence[str] = (),
+) -> str:
+    """Build a stable cache key for a chat call."""
+    payload = []
+    for message in convert_to_messages(messages):
+        content = message.content
+        if message.type == "system" and isinstance(content, str):
+            content = _CURRENT_TIME_RE.sub("", content, count=1)
+        payload.append((message.type, message.name, content))
+    raw = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "messages": payload,
+            "tools": sorted(tools),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_invoke(
+    llm: Runnable, messages: Sequence[Any], tools: Sequence[str] = ()
+) -> BaseMessage:
+    """Invoke the LLM, returning a cached response for an identical prompt."""
+    model, temperature = _model_settings(llm)
+    if model is None or temperature != 0:
+        # Sampled responses differ between calls, so replaying one is not safe
+        logger.debug("LLM cache skipped for %s (temperature=%s)", model, temperature)
+        return llm.invoke(messages)
+
+    key = make_key(model, temperature, messages, tools)
+    with _lock:
+        response = _cache.get(key)
+        if response is not None:
+            _cache.move_to_end(key)
+    if response is not None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        logger.info(
+            "LLM cache hit for %s, saved %s tokens",
+            model,
+            usage.get("total_tokens", "?"),
+        )
+        return response.model_copy()
+
+    logger.info("LLM cache miss for %s", model)
+    response = llm.invoke(messages)
+    with _lock:
+        _cache[key] = response
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return response.model_copy()
+
+
+def clear() -> None:
+    """Drop all cached responses."""
+    with _lock:
+        _cache.clear()
@@ -4,7 +4,7 @@
 from enum import Enum
 from typing import List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class PlanningMode(str, Enum):
@@ -65,8 +65,8 @@ class ParallelMultiAgentPlan(BaseModel):
         description="Target confidence level for the investigation"
     )
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "locale": "en-US",
@@ -97,6 +97,7 @@ class ParallelMultiAgentPlan(BaseModel):
                 }
             ]
         }
+    )
 
 
 # Backwards compatibility with existing system
@@ -131,8 +132,8 @@ class UnifiedResearchPlan(BaseModel):
     title: str = Field(..., description="Research investigation title")
     
     # Для параллельного режима
-    subagent_streams: Optional[List[SubAgentStream]] = Field(
-        default=None,
+    subagent_streams: List[SubAgentStream] = Field(
+        default_factory=list,
         description="Parallel investigation streams (multi-agent mode)"
     )
     synthesis_strategy: Optional[str] = Field(
@@ -149,11 +150,17 @@ class UnifiedResearchPlan(BaseModel):
         default=None,
         description="Context sufficiency (sequential mode)"
     )
-    steps: Optional[List[Step]] = Field(
-        default=None,
+    steps: List[Step] = Field(
+        default_factory=list,
         description="Sequential steps (sequential mode)"
     )
     
+    @field_validator("subagent_streams", "steps", mode="before")
+    @classmethod
+    def _none_as_empty(cls, value):
+        """Планировщик может вернуть null для неиспользуемого режима"""
+        return [] if value is None else value
+    
     @property
     def is_parallel_mode(self) -> bool:
         """Проверяет, используется ли параллельный режим"""
@@ -181,9 +188,6 @@ class UnifiedResearchPlan(BaseModel):
     
     def mark_stream_completed(self, stream_id: str, findings: str, confidence: float):
         """Отмечает поток как завершенный"""
-        if not self.subagent_streams:
-            return
-        
         for stream in self.subagent_streams:
             if stream.stream_id == stream_id:
                 stream.status = "completed"
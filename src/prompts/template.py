@@ -3,6 +3,7 @@
 
 import os
 import dataclasses
+import functools
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from langgraph.prebuilt.chat_agent_executor import AgentState
@@ -17,6 +18,12 @@ env = Environment(
 )
 
 
+@functools.lru_cache(maxsize=32)
+def _compiled_template(prompt_name: str):
+    """Load and compile a prompt template once per process."""
+    return env.get_template(f"{prompt_name}.md")
+
+
 def get_prompt_template(prompt_name: str) -> str:
     """
     Load and return a prompt template using Jinja2.
@@ -28,7 +35,7 @@ def get_prompt_template(prompt_name: str) -> str:
         The template string with proper variable substitution syntax
     """
     try:
-        template = env.get_template(f"{prompt_name}.md")
+        template = _compiled_template(prompt_name)
         return template.render()
     except Exception as e:
         raise ValueError(f"Error loading template {prompt_name}: {e}")
@@ -58,7 +65,7 @@ def apply_prompt_template(
         state_vars.update(dataclasses.asdict(configurable))
 
     try:
-        template = env.get_template(f"{prompt_name}.md")
+        template = _compiled_template(prompt_name)
         system_prompt = template.render(**state_vars)
         return [{"role": "system", "content": system_prompt}] + state["messages"]
     except Exception as e:
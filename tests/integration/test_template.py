@@ -143,3 +143,16 @@ def test_apply_prompt_template_reporter():
     messages_cn = apply_prompt_template("reporter", test_state_social_media_cn)
     system_content_cn = messages_cn[0]["content"]
     assert "小红书" in system_content_cn
+
+
+def test_templates_are_compiled_once():
+    """Test that repeated renders reuse the compiled template"""
+    from src.prompts.template import _compiled_template
+
+    _compiled_template.cache_clear()
+    apply_prompt_template("coder", {"messages": []})
+    apply_prompt_template("coder", {"messages": []})
+    get_prompt_template("coder")
+
+    info = _compiled_template.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
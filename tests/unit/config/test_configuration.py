@@ -62,9 +62,9 @@ def test_from_runnable_config_with_env_override(monkeypatch):
         }
     }
     config = Configuration.from_runnable_config(config_dict)
-    # Environment variables take precedence and are strings
-    assert config.max_plan_iterations == "9"
-    assert config.max_step_num == "11"
+    # Environment variables take precedence and are parsed as ints
+    assert config.max_plan_iterations == 9
+    assert config.max_step_num == 11
     assert config.max_search_results == 4  # not overridden
     # Clean up
     monkeypatch.delenv("MAX_PLAN_ITERATIONS")
@@ -93,3 +93,27 @@ def test_from_runnable_config_with_no_config():
     assert config.max_search_results == 3
     assert config.resources == []
     assert config.mcp_settings is None
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [("true", True), ("1", True), ("YES", True), ("false", False), ("0", False)],
+)
+def test_from_runnable_config_parses_bool_env(monkeypatch, raw, expected):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", raw)
+    config = Configuration.from_runnable_config()
+    assert config.llm_cache_enabled is expected
+
+
+@pytest.mark.parametrize(
+    "name,raw,expected",
+    [
+        ("PARALLEL_SUBAGENT_CONCURRENCY", "2", 2),
+        ("MAX_STEP_NUM", " 5 ", 5),
+        ("MAX_PLAN_ITERATIONS", "0", 1),
+    ],
+)
+def test_from_runnable_config_parses_int_env(monkeypatch, name, raw, expected):
+    monkeypatch.setenv(name, raw)
+    config = Configuration.from_runnable_config()
+    assert getattr(config, name.lower()) == expected
@@ -83,15 +83,35 @@ def test_build_base_graph_adds_nodes_and_edges(MockStateGraph):
 
     # Check that all nodes and edges are added
     assert mock_builder.add_edge.call_count >= 2
-    assert mock_builder.add_node.call_count >= 8
-    mock_builder.add_conditional_edges.assert_called_once()
+    added_nodes = {call.args[0] for call in mock_builder.add_node.call_args_list}
+    assert added_nodes == {
+        "coordinator",
+        "background_investigator",
+        "planner",
+        "reporter",
+        "human_feedback",
+        "parallel_research",
+    }
+    mock_builder.add_conditional_edges.assert_not_called()
+
+
+def test_planner_routes_only_through_command():
+    builder = builder_mod._build_base_graph()
+    assert "planner" not in builder.branches
+    assert not any(source == "planner" for source, _ in builder.edges)
 
 
-@patch("src.graph.builder._build_base_graph")
+def test_human_feedback_routes_only_through_command():
+    builder = builder_mod._build_base_graph()
+    assert "human_feedback" not in builder.branches
+    assert not any(source == "human_feedback" for source, _ in builder.edges)
+
+
+@patch("src.graph.builder._shared_builder")
 @patch("src.graph.builder.MemorySaver")
-def test_build_graph_with_memory_uses_memory(MockMemorySaver, mock_build_base_graph):
+def test_build_graph_with_memory_uses_memory(MockMemorySaver, mock_shared_builder):
     mock_builder = MagicMock()
-    mock_build_base_graph.return_value = mock_builder
+    mock_shared_builder.return_value = mock_builder
     mock_memory = MagicMock()
     MockMemorySaver.return_value = mock_memory
 
@@ -100,16 +120,30 @@ def test_build_graph_with_memory_uses_memory(MockMemorySaver, mock_build_base_gr
     mock_builder.compile.assert_called_once_with(checkpointer=mock_memory)
 
 
-@patch("src.graph.builder._build_base_graph")
-def test_build_graph_without_memory(mock_build_base_graph):
+@patch("src.graph.builder._shared_builder")
+def test_build_graph_without_memory(mock_shared_builder):
     mock_builder = MagicMock()
-    mock_build_base_graph.return_value = mock_builder
+    mock_shared_builder.return_value = mock_builder
 
     builder_mod.build_graph()
 
     mock_builder.compile.assert_called_once_with()
 
 
+def test_builder_is_built_once_and_compiled_per_call():
+    builder_mod._shared_builder.cache_clear()
+    with patch("src.graph.builder._build_base_graph") as mock_base:
+        mock_builder = MagicMock()
+        mock_base.return_value = mock_builder
+
+        builder_mod.build_graph()
+        builder_mod.build_graph_with_memory()
+
+        mock_base.assert_called_once_with()
+        assert mock_builder.compile.call_count == 2
+    builder_mod._shared_builder.cache_clear()
+
+
 def test_graph_is_compiled():
     # The graph object should be the result of build_graph()
     with patch("src.graph.builder._build_base_graph") as mock_base:
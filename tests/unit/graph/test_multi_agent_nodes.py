@@ -0,0 +1,476 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.errors import GraphRecursionError
+
+from src.config.configuration import Configuration
+from src.graph import multi_agent_nodes
+from src.graph.multi_agent_nodes import (
+    MultiAgentCoordinator,
+    SubAgentTask,
+    parallel_research_node,
+    should_use_parallel_research,
+)
+from src.prompts.multi_agent_planner_model import (
+    PlanningMode,
+    SubAgentStream,
+    UnifiedResearchPlan,
+)
+
+
+@pytest.fixture
+def coordinator():
+    with patch(
+        "src.graph.multi_agent_nodes.get_web_search_tool", return_value=MagicMock()
+    ):
+        yield MultiAgentCoordinator(Configuration())
+
+
+def test_select_tools_reuses_precomputed_lists(coordinator):
+    with_repl = coordinator._select_tools_for_aspect("data_analysis")
+    without_repl = coordinator._select_tools_for_aspect("historical_context")
+
+    assert with_repl is coordinator._select_tools_for_aspect("technical_specs")
+    assert without_repl is coordinator._select_tools_for_aspect("stakeholder_analysis")
+    assert len(with_repl) == len(without_repl) + 1
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("What is Python?", 2),
+        ("Analyze the market", 3),
+        ("Проанализируй влияние ИИ", 4),
+        ("Compare the system architecture and its future impact", 5),
+        ("ANALYZE the CURRENT STATE of the Code", 5),
+    ],
+)
+def test_assess_query_complexity(coordinator, query, expected):
+    assert coordinator._assess_query_complexity(query) == expected
+
+
+def test_assess_query_complexity_long_query(coordinator):
+    query = "one two three four five six seven eight nine ten eleven"
+    assert coordinator._assess_query_complexity(query) == 3
+
+
+def _fake_agent(messages, error=None):
+    """Agent whose astream yields one "values" step per message."""
+    agent = MagicMock()
+    agent.closed = False
+
+    async def astream(input, config, stream_mode):
+        agent.config = config
+        try:
+            history = list(input["messages"])
+            if history:
+                yield {"messages": list(history)}
+            for message in messages:
+                history.append(message)
+                yield {"messages": list(history)}
+            if error is not None:
+                raise error
+        finally:
+            agent.closed = True
+
+    agent.astream = astream
+    return agent
+
+
+def _make_task(agent_id, agent_type="researcher"):
+    return SubAgentTask(
+        agent_id=agent_id,
+        research_focus=f"Focus {agent_id}",
+        description="desc",
+        tools=[],
+        agent_type=agent_type,
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_parallel_research_bounds_concurrency():
+    running = 0
+    peak = 0
+
+    async def fake_astream(input, config, stream_mode):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        yield {"messages": [AIMessage(content="Key finding: done")]}
+
+    agent = MagicMock()
+    agent.astream = fake_astream
+    with (
+        patch(
+            "src.graph.multi_agent_nodes.get_web_search_tool", return_value=MagicMock()
+        ),
+        patch("src.graph.multi_agent_nodes.create_agent", return_value=agent),
+    ):
+        coordinator = MultiAgentCoordinator(
+            Configuration(parallel_subagent_concurrency=2)
+        )
+        results = await coordinator.execute_parallel_research(
+            [_make_task(f"agent_{i}") for i in range(5)], {}
+        )
+
+    assert len(results) == 5
+    assert peak == 2
+
+
+def test_get_agent_reuses_agents_per_type_and_tools(coordinator):
+    with patch(
+        "src.graph.multi_agent_nodes.create_agent",
+        side_effect=lambda **kwargs: MagicMock(),
+    ) as mock_create:
+        repl_tools = coordinator._select_tools_for_aspect("data_analysis")
+        base_tools = coordinator._select_tools_for_aspect("historical_context")
+
+        first = coordinator._get_agent("coder", repl_tools)
+        assert coordinator._get_agent("coder", repl_tools) is first
+        assert coordinator._get_agent("researcher", repl_tools) is not first
+        assert coordinator._get_agent("researcher", base_tools) is not first
+
+    assert mock_create.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_parallel_research_keeps_results_when_one_fails(coordinator):
+    ok_agent = _fake_agent([AIMessage(content="Key finding: done")])
+
+    def fake_create_agent(agent_type, **kwargs):
+        if agent_type == "coder":
+            raise RuntimeError("boom")
+        return ok_agent
+
+    with patch(
+        "src.graph.multi_agent_nodes.create_agent", side_effect=fake_create_agent
+    ):
+        results = await coordinator.execute_parallel_research(
+            [_make_task("broken", "coder"), _make_task("healthy")], {}
+        )
+
+    by_id = {r.agent_id: r for r in results}
+    assert by_id["broken"].success is False
+    assert by_id["broken"].confidence_score == 0.0
+    assert "boom" in by_id["broken"].key_findings
+    assert by_id["healthy"].success is True
+    assert "Key finding" in by_id["healthy"].key_findings
+
+
+def test_extract_sources_from_markdown(coordinator):
+    content = (
+        "See [Report](https://example.com/report?id=1) and https://example.com/a.\n"
+        'Again: <https://example.com/a>, plus "http://foo.org/x".'
+    )
+    assert coordinator._extract_sources(content) == [
+        "https://example.com/report?id=1",
+        "https://example.com/a",
+        "http://foo.org/x",
+    ]
+
+
+def test_extract_sources_keeps_balanced_parentheses(coordinator):
+    content = (
+        "[Python](https://en.wikipedia.org/wiki/Python_(programming_language)) "
+        "(see https://example.com/a).\n"
+        "Also https://example.com/b), and https://example.com/c_(x)."
+    )
+    assert coordinator._extract_sources(content) == [
+        "https://en.wikipedia.org/wiki/Python_(programming_language)",
+        "https://example.com/a",
+        "https://example.com/b",
+        "https://example.com/c_(x)",
+    ]
+
+
+def test_extract_sources_stops_at_non_ascii_text(coordinator):
+    content = "来源：https://example.com/report详见附录，以及https://example.com/a。"
+    assert coordinator._extract_sources(content) == [
+        "https://example.com/report",
+        "https://example.com/a",
+    ]
+
+
+def test_extract_sources_strips_code_and_template_delimiters(coordinator):
+    content = "Run `curl https://example.com/api` or use {https://example.com/b}."
+    assert coordinator._extract_sources(content) == [
+        "https://example.com/api",
+        "https://example.com/b",
+    ]
+
+
+def test_extract_sources_without_urls(coordinator):
+    assert coordinator._extract_sources("no links here, only $100 stats") == []
+
+
+@pytest.mark.parametrize(
+    "num_agents,expected_types",
+    [
+        (2, ["current_state", "future_trends"]),
+        (3, ["current_state", "historical_context", "future_trends"]),
+        (
+            4,
+            [
+                "current_state",
+                "historical_context",
+                "stakeholder_analysis",
+                "technical_specs",
+            ],
+        ),
+        (10, None),
+    ],
+)
+def test_identify_research_aspects(coordinator, num_agents, expected_types):
+    aspects = coordinator._identify_research_aspects("quantum computing", num_agents)
+
+    if expected_types is None:
+        assert len(aspects) == 6
+    else:
+        assert [a["type"] for a in aspects] == expected_types
+    assert all(a["description"].endswith(": quantum computing") for a in aspects)
+
+
+def test_compress_findings_keeps_first_five_key_lines(coordinator):
+    lines = [f"Key finding {i}" for i in range(7)]
+    raw = "intro\n" + "\n".join(lines) + "\nIMPORTANT results follow"
+
+    compressed = coordinator._compress_findings(raw, "Focus")
+
+    assert compressed == "**Focus**:\n" + "\n".join(lines[:5])
+
+
+@pytest.mark.asyncio
+async def test_execute_subagent_task_scans_key_lines_once(coordinator):
+    agent = _fake_agent([AIMessage(content="Key finding: https://example.com/a")])
+
+    with (
+        patch("src.graph.multi_agent_nodes.create_agent", return_value=agent),
+        patch(
+            "src.graph.multi_agent_nodes._take_key_lines",
+            wraps=multi_agent_nodes._take_key_lines,
+        ) as take_key_lines,
+    ):
+        result = await coordinator._execute_subagent_task(_make_task("agent"), {})
+
+    assert result.key_findings == "**Focus agent**:\nKey finding: https://example.com/a"
+    assert result.confidence_score == pytest.approx(0.8)
+    # Один раз в _run_agent для раннего выхода и один раз для сжатия и уверенности
+    assert take_key_lines.call_count == 2
+
+
+def test_compress_findings_truncates_without_key_lines(coordinator):
+    raw = "x" * 1500
+
+    compressed = coordinator._compress_findings(raw, "Focus")
+
+    assert compressed == "**Focus**:\n" + "x" * 1000 + "..."
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query,offloaded",
+    [("analyze AI", False), ("a" * 2001, True)],
+    ids=["short", "long"],
+)
+async def test_create_parallel_research_plan_offloads_long_queries(
+    coordinator, query, offloaded
+):
+    with patch(
+        "src.graph.multi_agent_nodes.asyncio.to_thread",
+        side_effect=lambda func, *args: func(*args),
+    ) as mock_to_thread:
+        tasks = await coordinator.create_parallel_research_plan(query)
+
+    assert mock_to_thread.called is offloaded
+    assert len(tasks) >= 2
+
+
+@pytest.mark.parametrize(
+    "num_sources,has_key_lines,expected",
+    [(0, False, 0.5), (2, False, 0.7), (1, True, 0.8), (5, False, 1.0), (5, True, 1.0)],
+)
+def test_estimate_confidence(coordinator, num_sources, has_key_lines, expected):
+    sources = [f"https://example.com/{i}" for i in range(num_sources)]
+    assert coordinator._estimate_confidence(sources, has_key_lines) == pytest.approx(
+        expected
+    )
+
+
+@pytest.mark.parametrize(
+    "topic,expected",
+    [
+        ("What is Python?", False),
+        ("Analyze the EV Markets", True),
+        ("", False),
+    ],
+)
+def test_should_use_parallel_research_by_topic(topic, expected):
+    state = {"current_plan": MagicMock(steps=[]), "research_topic": topic}
+    assert should_use_parallel_research(state) is expected
+
+
+def test_should_use_parallel_research_without_plan():
+    assert should_use_parallel_research({"research_topic": "analyze"}) is False
+
+
+@pytest.mark.asyncio
+async def test_run_agent_returns_final_answer(coordinator):
+    agent = _fake_agent(
+        [
+            AIMessage(
+                content="", tool_calls=[{"name": "web_search", "args": {}, "id": "1"}]
+            ),
+            ToolMessage(content="search results", tool_call_id="1"),
+            AIMessage(content="Key finding: final answer"),
+        ]
+    )
+
+    content = await coordinator._run_agent(agent, {"messages": []}, "agent")
+
+    assert content == "Key finding: final answer"
+    assert agent.config == {"recursion_limit": 8}
+
+
+@pytest.mark.asyncio
+async def test_run_agent_stops_once_enough_key_lines(coordinator):
+    findings = "\n".join(f"Key finding {i}" for i in range(5))
+    agent = _fake_agent(
+        [
+            AIMessage(
+                content=findings,
+                tool_calls=[{"name": "web_search", "args": {}, "id": "1"}],
+            ),
+            ToolMessage(content="more results", tool_call_id="1"),
+            AIMessage(content="never reached"),
+        ]
+    )
+
+    content = await coordinator._run_agent(agent, {"messages": []}, "agent")
+
+    assert content == findings
+    assert agent.closed
+
+
+@pytest.mark.asyncio
+async def test_run_agent_keeps_partial_results_on_recursion_limit(coordinator):
+    agent = _fake_agent(
+        [
+            AIMessage(
+                content="Partial key finding",
+                tool_calls=[{"name": "web_search", "args": {}, "id": "1"}],
+            ),
+            ToolMessage(content="raw results", tool_call_id="1"),
+        ],
+        error=GraphRecursionError("limit"),
+    )
+
+    content = await coordinator._run_agent(agent, {"messages": []}, "agent")
+
+    assert content == "Partial key finding"
+
+
+@pytest.mark.asyncio
+async def test_run_agent_ignores_task_prompt(coordinator):
+    agent = _fake_agent([], error=GraphRecursionError("limit"))
+
+    content = await coordinator._run_agent(
+        agent, {"messages": [HumanMessage(content="Focused Research Task")]}, "agent"
+    )
+
+    assert content == ""
+
+
+def _make_plan(streams):
+    return UnifiedResearchPlan(
+        locale="en-US",
+        planning_mode=PlanningMode.PARALLEL_MULTI_AGENT,
+        thought="t",
+        title="EV market",
+        subagent_streams=[
+            SubAgentStream(
+                stream_id=stream_id,
+                research_focus=f"Focus {stream_id}",
+                description="desc",
+                success_criteria="done",
+                tool_requirements=tool_requirements,
+            )
+            for stream_id, tool_requirements in streams
+        ],
+    )
+
+
+def test_create_tasks_from_streams(coordinator):
+    plan = _make_plan([("market", ["web_search"]), ("stats", ["python_repl"])])
+
+    market, stats = coordinator.create_tasks_from_streams(plan.subagent_streams)
+
+    assert (market.agent_id, market.agent_type) == ("market", "researcher")
+    assert market.tools is coordinator._base_tools
+    assert (stats.agent_id, stats.agent_type) == ("stats", "coder")
+    assert stats.tools is coordinator._tools_with_repl
+    assert "Success criteria: done" in stats.description
+
+
+@pytest.mark.parametrize("repl_name", ["python_repl_tool", "python_repl"])
+def test_create_tasks_from_streams_accepts_repl_tool_names(coordinator, repl_name):
+    plan = _make_plan([("stats", ["web_search", repl_name])])
+
+    (stats,) = coordinator.create_tasks_from_streams(plan.subagent_streams)
+
+    assert stats.agent_type == "coder"
+    assert stats.tools is coordinator._tools_with_repl
+
+
+@pytest.mark.asyncio
+async def test_parallel_research_node_runs_plan_streams():
+    plan = _make_plan([("market", []), ("stats", ["python_repl"])])
+
+    def fake_create_agent(agent_type, **kwargs):
+        if agent_type == "coder":
+            raise RuntimeError("boom")
+        return _fake_agent([AIMessage(content="Key finding: done")])
+
+    with (
+        patch(
+            "src.graph.multi_agent_nodes.get_web_search_tool", return_value=MagicMock()
+        ),
+        patch(
+            "src.graph.multi_agent_nodes.create_agent", side_effect=fake_create_agent
+        ),
+    ):
+        command = await parallel_research_node({"current_plan": plan}, {})
+
+    assert command.goto == "reporter"
+    assert {
+        r["agent_id"]: r["success"] for r in command.update["subagent_results"]
+    } == {"market": True, "stats": False}
+    assert len(command.update["observations"]) == 2
+    assert [s.status for s in plan.subagent_streams] == ["completed", "pending"]
+    assert "Key finding" in plan.subagent_streams[0].findings
+
+
+@pytest.mark.asyncio
+async def test_parallel_research_node_without_plan_skips_tool_setup():
+    with patch(
+        "src.graph.multi_agent_nodes.get_web_search_tool",
+        side_effect=ValueError("Did not find tavily_api_key"),
+    ) as get_web_search_tool:
+        command = await parallel_research_node({"current_plan": None}, {})
+
+    assert command.goto == "reporter"
+    get_web_search_tool.assert_not_called()
+
+
+def test_subagent_task_is_slotted_and_immutable():
+    task = _make_task("agent")
+
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.agent_id = "other"
@@ -0,0 +1,329 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.messages import AIMessage
+
+from src.graph import plan_cache
+from src.graph.nodes import (
+    _REPORTER_REMINDER,
+    _get_planner_llm,
+    background_investigation_node,
+    coordinator_node,
+    human_feedback_node,
+    planner_node,
+    reporter_node,
+)
+from src.prompts.multi_agent_planner_model import UnifiedResearchPlan
+
+PLAN_BODY = (
+    '{"locale": "en-US", "planning_mode": "parallel_multi_agent", '
+    '"thought": "t", "title": "EV market", "has_enough_context": True,}'
+)
+
+
+def _planner_llm(content):
+    llm = MagicMock()
+    llm.stream.return_value = [MagicMock(content=content)]
+    return llm
+
+
+def _run_planner(llm, plan_iterations=0, **configurable):
+    state = {
+        "messages": [],
+        "research_topic": "EV market",
+        "locale": "en-US",
+        "plan_iterations": plan_iterations,
+    }
+    config = {"configurable": {"max_plan_iterations": 2, **configurable}}
+    _get_planner_llm.cache_clear()
+    with (
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch("src.graph.nodes.AGENT_LLM_MAP", {"planner": "reasoning"}),
+    ):
+        return planner_node(state, config)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        PLAN_BODY,
+        f"```json\n{PLAN_BODY}\n```",
+        f"Here is the plan:\n{PLAN_BODY}\nLet me know.",
+    ],
+    ids=["bare", "fenced", "prose"],
+)
+def test_planner_node_parses_plan(content):
+    command = _run_planner(_planner_llm(content))
+
+    assert command.goto == "reporter"
+    assert command.update["current_plan"].title == "EV market"
+    assert command.update["current_plan"].has_enough_context is True
+
+
+@pytest.mark.parametrize("plan_iterations,goto", [(0, "__end__"), (1, "reporter")])
+def test_planner_node_handles_invalid_json(plan_iterations, goto):
+    command = _run_planner(_planner_llm("I cannot plan this."), plan_iterations)
+
+    assert command.goto == goto
+    assert command.update is None
+
+
+@pytest.fixture
+def empty_plan_cache():
+    plan_cache.clear()
+    yield
+    plan_cache.clear()
+
+
+def test_planner_node_reuses_cached_plan(empty_plan_cache):
+    llm = _planner_llm(PLAN_BODY)
+
+    first = _run_planner(llm, plan_cache_enabled=True)
+    second = _run_planner(llm, plan_cache_enabled=True)
+
+    assert llm.stream.call_count == 1
+    assert first.goto == second.goto == "reporter"
+    assert second.update["current_plan"] == first.update["current_plan"]
+    assert second.update["current_plan"] is not first.update["current_plan"]
+
+
+def test_planner_node_skips_cache_when_disabled(empty_plan_cache):
+    llm = _planner_llm(PLAN_BODY)
+
+    _run_planner(llm)
+    _run_planner(llm)
+
+    assert llm.stream.call_count == 2
+    assert plan_cache.lookup("EV market", "en-US") is None
+
+
+@pytest.mark.parametrize(
+    "search_result,expected",
+    [
+        ("plain text results", "plain text results"),
+        ([{"title": "Тест", "url": "u"}], '[{"title": "Тест", "url": "u"}]'),
+    ],
+    ids=["text", "structured"],
+)
+@pytest.mark.asyncio
+async def test_background_investigation_node_non_tavily(search_result, expected):
+    tool = MagicMock()
+    tool.ainvoke = AsyncMock(return_value=search_result)
+    with (
+        patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", "duckduckgo"),
+        patch("src.graph.nodes.get_web_search_tool", return_value=tool),
+    ):
+        result = await background_investigation_node({"research_topic": "q"}, {})
+
+    assert result == {"background_investigation_results": expected}
+
+
+@pytest.mark.asyncio
+async def test_background_investigation_node_tavily():
+    search = MagicMock()
+    search.ainvoke = AsyncMock(
+        return_value=[
+            {"title": "A", "content": "first"},
+            {"title": "B", "content": "second"},
+        ]
+    )
+    with (
+        patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", "tavily"),
+        patch("src.graph.nodes.LoggedTavilySearch", return_value=search),
+    ):
+        result = await background_investigation_node({"research_topic": "q"}, {})
+
+    assert result == {
+        "background_investigation_results": "## A\n\nfirst\n\n## B\n\nsecond"
+    }
+
+
+def _plan(has_enough_context):
+    return UnifiedResearchPlan(
+        locale="zh-CN",
+        planning_mode="parallel_multi_agent",
+        thought="t",
+        title="EV market",
+        has_enough_context=has_enough_context,
+    )
+
+
+@pytest.mark.parametrize(
+    "has_enough_context,goto", [(True, "reporter"), (False, "parallel_research")]
+)
+def test_human_feedback_node_reuses_validated_plan(has_enough_context, goto):
+    plan = _plan(has_enough_context)
+    state = {"current_plan": plan, "auto_accepted_plan": True, "plan_iterations": 1}
+
+    with patch.object(UnifiedResearchPlan, "model_validate") as mock_validate:
+        command = human_feedback_node(state)
+
+    mock_validate.assert_not_called()
+    assert command.goto == goto
+    assert command.update["current_plan"] is plan
+    assert command.update["plan_iterations"] == 2
+    assert command.update["locale"] == "zh-CN"
+
+
+def test_human_feedback_node_parses_plan_string():
+    state = {
+        "current_plan": f"```json\n{_plan(False).model_dump_json()}\n```",
+        "auto_accepted_plan": True,
+    }
+
+    command = human_feedback_node(state)
+
+    assert command.goto == "parallel_research"
+    assert command.update["current_plan"] == _plan(False)
+    assert command.update["plan_iterations"] == 1
+
+
+@pytest.mark.parametrize("plan_iterations,goto", [(0, "__end__"), (1, "reporter")])
+def test_human_feedback_node_handles_invalid_plan(plan_iterations, goto):
+    state = {
+        "current_plan": "not a plan",
+        "auto_accepted_plan": True,
+        "plan_iterations": plan_iterations,
+    }
+
+    assert human_feedback_node(state).goto == goto
+
+
+def _run_coordinator(tool_calls, state=None):
+    llm = MagicMock()
+    llm.bind_tools.return_value.invoke.return_value = AIMessage(
+        content="", tool_calls=tool_calls
+    )
+    with (
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+    ):
+        return coordinator_node({"messages": [], **(state or {})}, {})
+
+
+def test_coordinator_node_reads_handoff_args():
+    command = _run_coordinator(
+        [
+            {"name": "other_tool", "args": {"locale": "fr-FR"}, "id": "1"},
+            {"name": "handoff_to_planner", "args": {"locale": "zh-CN"}, "id": "2"},
+            {
+                "name": "handoff_to_planner",
+                "args": {"locale": "de-DE", "research_topic": "EV market"},
+                "id": "3",
+            },
+        ]
+    )
+
+    assert command.goto == "planner"
+    assert command.update["locale"] == "de-DE"
+    assert command.update["research_topic"] == "EV market"
+
+
+def test_coordinator_node_keeps_state_defaults_without_complete_args():
+    command = _run_coordinator(
+        [{"name": "handoff_to_planner", "args": {"locale": "zh-CN"}, "id": "1"}],
+        {"locale": "en-US", "research_topic": "topic"},
+    )
+
+    assert command.goto == "planner"
+    assert (command.update["locale"], command.update["research_topic"]) == (
+        "en-US",
+        "topic",
+    )
+
+
+def test_get_planner_llm_binds_structured_output_once():
+    basic = MagicMock()
+    _get_planner_llm.cache_clear()
+    with patch("src.graph.nodes.get_llm_by_type", return_value=basic) as mock_get:
+        first = _get_planner_llm(False, "basic")
+        assert _get_planner_llm(False, "basic") is first
+        assert _get_planner_llm(True, "basic") is basic
+    _get_planner_llm.cache_clear()
+
+    basic.with_structured_output.assert_called_once_with(
+        UnifiedResearchPlan, method="json_mode"
+    )
+    assert [call.args for call in mock_get.call_args_list] == [
+        ("basic",),
+        ("reasoning",),
+    ]
+
+
+@pytest.mark.parametrize(
+    "feedback,goto",
+    [
+        ("[edit_plan] " + "x" * 5000, "planner"),
+        ("[Accepted]", "parallel_research"),
+    ],
+    ids=["edit", "accepted"],
+)
+def test_human_feedback_node_feedback_prefix(feedback, goto):
+    state = {"current_plan": _plan(False), "auto_accepted_plan": False}
+
+    with patch("src.graph.nodes.interrupt", return_value=feedback):
+        command = human_feedback_node(state)
+
+    assert command.goto == goto
+
+
+@pytest.mark.parametrize("feedback", ["", None, "looks fine"])
+def test_human_feedback_node_rejects_unknown_feedback(feedback):
+    state = {"current_plan": _plan(False), "auto_accepted_plan": False}
+
+    with patch("src.graph.nodes.interrupt", return_value=feedback):
+        with pytest.raises(TypeError):
+            human_feedback_node(state)
+
+
+def test_reporter_node_sends_each_observation_once():
+    llm = MagicMock()
+    llm.invoke.return_value = AIMessage(content="report")
+    state = {
+        "current_plan": _plan(False),
+        "observations": ["first", "second", "first"],
+    }
+
+    with patch("src.graph.nodes.get_llm_by_type", return_value=llm):
+        result = reporter_node(state, {})
+
+    assert result == {"final_report": "report"}
+    (invoke_messages,), _ = llm.invoke.call_args
+    observations = [
+        m.content for m in invoke_messages if getattr(m, "name", None) == "observation"
+    ]
+    assert [o.rsplit("\n", 1)[-1] for o in observations] == ["first", "second"]
+
+
+def test_reporter_node_puts_reminder_right_after_system_prompt():
+    llm = MagicMock()
+    llm.invoke.return_value = AIMessage(content="report")
+    state = {"current_plan": _plan(False), "observations": ["finding"]}
+
+    with patch("src.graph.nodes.get_llm_by_type", return_value=llm):
+        reporter_node(state, {})
+
+    (invoke_messages,), _ = llm.invoke.call_args
+    assert invoke_messages[0]["role"] == "system"
+    assert invoke_messages[1] is _REPORTER_REMINDER
+    assert invoke_messages[2].content.startswith("# Research Requirements")
+    assert invoke_messages[3].name == "observation"
+
+
+def test_coordinator_node_ends_without_tool_calls():
+    command = _run_coordinator([], {"locale": "zh-CN"})
+
+    assert command.goto == "__end__"
+    assert command.update["locale"] == "zh-CN"
+
+
+def test_coordinator_node_goes_to_background_investigation():
+    command = _run_coordinator(
+        [{"name": "handoff_to_planner", "args": {}, "id": "1"}],
+        {"enable_background_investigation": True},
+    )
+
+    assert command.goto == "background_investigator"
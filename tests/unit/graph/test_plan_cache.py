@@ -0,0 +1,51 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+import pytest
+from unittest.mock import patch
+
+from src.graph import plan_cache
+
+PLAN_JSON = json.dumps(
+    {
+        "locale": "en-US",
+        "planning_mode": "parallel_multi_agent",
+        "thought": "Needs research",
+        "title": "EV market",
+        "has_enough_context": False,
+    }
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    plan_cache.clear()
+    yield
+    plan_cache.clear()
+
+
+def test_lookup_normalizes_topic():
+    plan_cache.store("Analyze  the EV market", "en-US", PLAN_JSON)
+
+    assert plan_cache.lookup("analyze the ev MARKET ", "en-US") == PLAN_JSON
+    assert plan_cache.lookup("analyze the ev market", "zh-CN") is None
+
+
+def test_store_ignores_empty_topic():
+    plan_cache.store("", "en-US", PLAN_JSON)
+
+    assert plan_cache.lookup("", "en-US") is None
+
+
+def test_store_evicts_least_recently_used():
+    with patch.object(plan_cache, "_MAX_ENTRIES", 2):
+        plan_cache.store("a", "en-US", "1")
+        plan_cache.store("b", "en-US", "2")
+        plan_cache.lookup("a", "en-US")
+        plan_cache.store("c", "en-US", "3")
+
+    assert plan_cache.lookup("a", "en-US") == "1"
+    assert plan_cache.lookup("b", "en-US") is None
+    assert plan_cache.lookup("c", "en-US") == "3"
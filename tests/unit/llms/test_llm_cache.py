@@ -0,0 +1,83 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.llms import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    llm_cache.clear()
+    yield
+    llm_cache.clear()
+
+
+def _messages(time="Mon Jan 01 2025 10:00:00", question="hi"):
+    return [
+        {"role": "system", "content": f"CURRENT_TIME: {time}\n\nYou are helpful."},
+        HumanMessage(content=question),
+    ]
+
+
+def _llm(temperature=0, model_name="gpt-4o"):
+    """Tool-bound chat model stub: settings live on the wrapped model."""
+    llm = MagicMock()
+    llm.bound = SimpleNamespace(model_name=model_name, temperature=temperature)
+    llm.invoke.side_effect = lambda messages: AIMessage(content="answer")
+    return llm
+
+
+def test_make_key_ignores_current_time():
+    assert llm_cache.make_key("gpt-4o", 0, _messages()) == llm_cache.make_key(
+        "gpt-4o", 0, _messages(time="Tue Jan 02 2025 11:00:00")
+    )
+
+
+@pytest.mark.parametrize(
+    "model,temperature,messages,tools",
+    [
+        ("gpt-4o-mini", 0, _messages(), ()),
+        ("gpt-4o", 0.5, _messages(), ()),
+        ("gpt-4o", 0, _messages(question="bye"), ()),
+        ("gpt-4o", 0, _messages(), ("handoff_to_planner",)),
+    ],
+)
+def test_make_key_changes_with_inputs(model, temperature, messages, tools):
+    assert llm_cache.make_key(
+        model, temperature, messages, tools
+    ) != llm_cache.make_key("gpt-4o", 0, _messages())
+
+
+def test_cached_invoke_reuses_response():
+    llm = _llm()
+
+    first = llm_cache.cached_invoke(llm, _messages())
+    first.content = "mutated"
+    second = llm_cache.cached_invoke(llm, _messages())
+
+    assert llm.invoke.call_count == 1
+    assert second.content == "answer"
+
+
+def test_cached_invoke_separates_models():
+    llm_cache.cached_invoke(_llm(model_name="gpt-4o"), _messages())
+    other = _llm(model_name="gpt-4o-mini")
+
+    llm_cache.cached_invoke(other, _messages())
+
+    assert other.invoke.call_count == 1
+
+
+@pytest.mark.parametrize("temperature", [None, 0.7])
+def test_cached_invoke_skips_non_deterministic_models(temperature):
+    llm = _llm(temperature=temperature)
+
+    llm_cache.cached_invoke(llm, _messages())
+    llm_cache.cached_invoke(llm, _messages())
+
+    assert llm.invoke.call_count == 2
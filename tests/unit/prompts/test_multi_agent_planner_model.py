@@ -0,0 +1,75 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from src.prompts.multi_agent_planner_model import (
+    PlanningMode,
+    SubAgentStream,
+    UnifiedResearchPlan,
+)
+
+
+def _stream(stream_id):
+    return SubAgentStream(
+        stream_id=stream_id,
+        research_focus=stream_id,
+        description="desc",
+        success_criteria="done",
+    )
+
+
+def _plan(*stream_ids):
+    return UnifiedResearchPlan(
+        locale="en-US",
+        planning_mode=PlanningMode.PARALLEL_MULTI_AGENT,
+        thought="t",
+        title="title",
+        subagent_streams=[_stream(stream_id) for stream_id in stream_ids],
+    )
+
+
+def test_mark_stream_completed_updates_matching_stream():
+    plan = _plan("a", "b")
+
+    plan.mark_stream_completed("b", "findings", 0.9)
+
+    a, b = plan.subagent_streams
+    assert a.status == "pending"
+    assert (b.status, b.findings, b.confidence_score) == ("completed", "findings", 0.9)
+    assert not plan.is_research_complete()
+
+    plan.mark_stream_completed("a", "more", 0.7)
+    assert plan.is_research_complete()
+
+
+def test_mark_stream_completed_ignores_unknown_stream():
+    plan = _plan("a")
+
+    plan.mark_stream_completed("missing", "findings", 0.9)
+
+    assert plan.subagent_streams[0].status == "pending"
+
+
+def test_mark_stream_completed_prefers_first_duplicate():
+    plan = _plan("a", "a")
+
+    plan.mark_stream_completed("a", "findings", 0.9)
+
+    assert [s.status for s in plan.subagent_streams] == ["completed", "pending"]
+
+
+def test_unused_mode_fields_default_to_empty_lists():
+    plan = UnifiedResearchPlan.model_validate(
+        {
+            "locale": "en-US",
+            "planning_mode": "sequential_steps",
+            "thought": "t",
+            "title": "title",
+            "subagent_streams": None,
+        }
+    )
+
+    assert plan.subagent_streams == []
+    assert plan.steps == []
+    assert plan.get_active_streams() == []
+    assert plan.get_estimated_total_calls() == 0
+    assert not plan.is_research_complete()